@@ -1,44 +1,108 @@
+from collections import namedtuple
+import numpy as np
 
-class PlayerProfile:
-    def __init__(self, name, rating):
-        self.name = name
-        self.rating = rating
-        self.bidAndWon = 0
-        self.careerGames = 0
-        self.careerWins = 0
-    
-    def register_win(self, adjusted_points, bid_and_won = False):
-        self.careerGames += 1
-        self.careerWins += 1
 
-        # updating rating
-        self.rating += adjusted_points
-        self.rating = round(self.rating, 2)
+class PlayerRoster:
+    # ratings and career counters of every registered player, one slot per player
+    def __init__(self):
+        self.index = {}
+        self.names = []
+        self.ratings = np.zeros(0, dtype=np.float64)
+        self.careerGames = np.zeros(0, dtype=np.int64)
+        self.careerWins = np.zeros(0, dtype=np.int64)
+        self.bidAndWon = np.zeros(0, dtype=np.int64)
 
-        if bid_and_won:
-            self.bidAndWon += 1
+    def __len__(self):
+        return len(self.names)
 
-        
-    def register_loss(self, adjusted_points):
-        self.careerGames += 1
+    def register(self, name, rating):
+        idx = len(self.names)
+        self.index[name] = idx
+        self.names.append(name)
+
+        self.ratings = np.append(self.ratings, rating)
+        self.careerGames = np.append(self.careerGames, 0)
+        self.careerWins = np.append(self.careerWins, 0)
+        self.bidAndWon = np.append(self.bidAndWon, 0)
+        return idx
+
+    def register_wins(self, idx, adjusted_points, bid_and_won):
+        self.careerGames[idx] += 1
+        self.careerWins[idx] += 1
+
+        # updating ratings, Python's round is exact where np.round can land a cent off on a .xx5 boundary
+        self.ratings[idx] = [round(rating, 2) for rating in (self.ratings[idx] + adjusted_points).tolist()]
+
+        self.bidAndWon[idx] += bid_and_won
+
+    def register_losses(self, idx, adjusted_points):
+        self.careerGames[idx] += 1
 
-        # updating rating
-        self.rating -= adjusted_points
-        self.rating = round(self.rating, 2)
+        # updating ratings
+        self.ratings[idx] = [round(rating, 2) for rating in (self.ratings[idx] - adjusted_points).tolist()]
+
+    def snapshot(self):
+        columns = zip(self.names, self.ratings.tolist(), self.careerGames.tolist(), self.careerWins.tolist(), self.bidAndWon.tolist())
+        return {name: PlayerSnapshot(name, *fields) for name, *fields in columns}
+
+
+class PlayerRecord:
+    # stats derived from name, rating and career counters
+    __slots__ = ()
 
     def winPercentage(self):
         return int(100.0*(self.careerWins/self.careerGames))
 
     def bidAndWonPercentage(self):
         return int(100.0*(self.bidAndWon/self.careerGames))
-    
+
     def getDictForLeaderboard(self, new_rank, rank_change, new_rating, rating_change):
         return {
-            'Rank': new_rank, 
+            'Rank': new_rank,
             'Change': rank_change,
-            'Player': self.name, 
+            'Player': self.name,
             'Rating': f'{new_rating} ({rating_change})',
             '#Games': self.careerGames,
             'Win %': self.winPercentage(),
             'Bid+Win%': self.bidAndWonPercentage()
         }
+
+
+class PlayerSnapshot(namedtuple('PlayerSnapshot', 'name rating careerGames careerWins bidAndWon'), PlayerRecord):
+    # frozen copy of a player's profile at one point in time
+    __slots__ = ()
+
+
+class PlayerProfile(PlayerRecord):
+    # view of a single player's slot in a PlayerRoster
+    __slots__ = ('roster', 'idx')
+
+    def __init__(self, roster: PlayerRoster, idx: int):
+        self.roster = roster
+        self.idx = idx
+
+    @property
+    def name(self):
+        return self.roster.names[self.idx]
+
+    @property
+    def rating(self):
+        return float(self.roster.ratings[self.idx])
+
+    @property
+    def careerGames(self):
+        return int(self.roster.careerGames[self.idx])
+
+    @property
+    def careerWins(self):
+        return int(self.roster.careerWins[self.idx])
+
+    @property
+    def bidAndWon(self):
+        return int(self.roster.bidAndWon[self.idx])
+
+    def register_win(self, adjusted_points, bid_and_won = False):
+        self.roster.register_wins(self.idx, adjusted_points, bid_and_won)
+
+    def register_loss(self, adjusted_points):
+        self.roster.register_losses(self.idx, adjusted_points)
@@ -1,7 +1,7 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
-from utils.constants import TournamentTypes, get_graph_path
+from utils.constants import TournamentTypes, get_graph_path, get_player_color
 from utils.data_cruncher import get_bid_and_won_stats, get_championship_details, get_pairwise_stats, get_tri_stats
 
 
@@ -12,8 +12,11 @@ class Tournament:
     # todo create Player class
     rawData: pd.DataFrame
     players: list[str]
+    scores: np.ndarray
     playerStats: pd.DataFrame
     gameData: pd.DataFrame
+    cumSum: np.ndarray
+    winRatio: np.ndarray
     pairwiseStats: pd.DataFrame
     trioStats: pd.DataFrame
     bidAndWonStats:pd.DataFrame
@@ -23,19 +26,24 @@ class Tournament:
         self.tournamentNumber = tournament_number
         
         # read data from csv and store it
-        raw_df, players, game_data, player_stats = get_championship_details(self.tournamentNumber, self.tournamentType)
+        raw_df, players, scores, game_data, player_stats = get_championship_details(self.tournamentNumber, self.tournamentType)
 
         self.rawData = raw_df
         self.players = players
+        self.scores = scores
         self.playerStats = player_stats
         self.gameData = game_data
 
+        # (games x players) series used by the plots, columns ordered as self.players
+        self.cumSum = game_data[[f'CumSum_{player}' for player in players]].to_numpy()
+        self.winRatio = game_data[[f'WinRatio_{player}' for player in players]].to_numpy()
+
         if display:
             self.printTournamentHeader()
         
-        self.pairwiseStats = get_pairwise_stats(self.rawData, min_num_games=10)
-        self.trioStats = get_tri_stats(self.rawData, min_num_games=5)
-        self.bidAndWonStats = get_bid_and_won_stats(self.rawData)
+        self.pairwiseStats = get_pairwise_stats(self.rawData, min_num_games=10, scores=self.scores, players=self.players)
+        self.trioStats = get_tri_stats(self.rawData, min_num_games=5, scores=self.scores, players=self.players)
+        self.bidAndWonStats = get_bid_and_won_stats(self.rawData, scores=self.scores, players=self.players)
 
     def printTournamentHeader(self):
         
@@ -49,73 +57,93 @@ class Tournament:
         return self.tournamentType
     
     def display(self):
-        return f'{self.tournamentType.display()} #{self.tournamentNumber}'
+        return get_tournament_key(self.tournamentType, self.tournamentNumber)
 
     def getScoreBoard(self):
         return self.playerStats
     
-    def getLeaderboardBarplot(self, save_image: bool = False):
-        plot_leaderboard_barplot(self, save_image)
+    def getLeaderboardBarplot(self, save_image: bool = False, show: bool = True):
+        plot_leaderboard_barplot(self, save_image, show)
     
-    def getTimeseriesPlot(self, save_image: bool = False):
-        plot_leaderboard_timeseries(self, save_image)
+    def getTimeseriesPlot(self, save_image: bool = False, show: bool = True):
+        plot_leaderboard_timeseries(self, save_image, show)
+
+    def getWinRatioSeriesPlot(self, save_image: bool = False, show: bool = True):
+        plot_performance_timeseries(self, save_image, show)
 
-    def getWinRatioSeriesPlot(self, save_image: bool = False):
-        plot_performance_timeseries(self, save_image)
+
+# display name, also used by the rating system to key tournaments
+def get_tournament_key(tournament_type: TournamentTypes, tournament_number: int):
+    return f'{tournament_type.display()} #{tournament_number}'
 
 
 # todo - move this to different file later
-def plot_leaderboard_barplot(tournament: Tournament, save_image: bool = False):
+def plot_leaderboard_barplot(tournament: Tournament, save_image: bool = False, show: bool = True):
+    # pyplot is slow to import and only needed when plotting
+    import matplotlib.pyplot as plt
+
     player_stats = tournament.playerStats
 
-    plt.figure(figsize=(7, 4))
-    plt.bar(player_stats['Player'], player_stats['TotalPoints'], color=['pink', 'lightblue', 'lightgreen','lightcoral'])
+    fig = plt.figure(figsize=(7, 4))
+    colors = [get_player_color(player) for player in player_stats['Player']]
+    plt.bar(player_stats['Player'], player_stats['TotalPoints'].to_numpy(), color=colors)
     plt.xlabel('Player')
     plt.ylabel('Total Points')
     plt.title(f'Leaderboard : {tournament.display()}')
     plt.xticks(rotation=45)
     if save_image:
-        plt.savefig(get_graph_path(tournament.num(), 'total_points'))
-    plt.show()
+        fig.savefig(get_graph_path(tournament.num(), 'total_points', tournament.typ()))
+    show_or_close(fig, show)
 
 
-def plot_leaderboard_timeseries(tournament: Tournament, save_image=False):
+def plot_leaderboard_timeseries(tournament: Tournament, save_image=False, show=True):
+    import matplotlib.pyplot as plt
 
     # Plot the points accumulated over time
-    plt.figure(figsize=(10, 6))
+    fig = plt.figure(figsize=(10, 6))
 
-    game_data = tournament.gameData
+    game_ids = tournament.gameData['Game ID'].to_numpy()
     # Calculate cumulative points over time
-    for player in tournament.players:
-        plt.plot(game_data['Game ID'], game_data[f'CumSum_{player}'], marker='.', linestyle='-', label=player)
+    lines = plt.plot(game_ids, tournament.cumSum, marker='.', linestyle='-')
 
-    plt.legend()
+    plt.legend(lines, tournament.players)
     plt.xlabel('Game Number')
     plt.ylabel('Points Accumulated')
     plt.title(f'Points Accumulated Over Time : {tournament.display()}')
     plt.grid(True)
 
     if save_image:
-        plt.savefig(get_graph_path(tournament.num(), 'points_timeseries'))
+        fig.savefig(get_graph_path(tournament.num(), 'points_timeseries', tournament.typ()))
 
-    plt.show()
+    show_or_close(fig, show)
 
 
-def plot_performance_timeseries(tournament: Tournament, save_image=False):
-    game_data = tournament.gameData
+def plot_performance_timeseries(tournament: Tournament, save_image=False, show=True):
+    import matplotlib.pyplot as plt
+
+    game_ids = tournament.gameData['Game ID'].to_numpy()
 
     # Plot the points accumulated over time
-    plt.figure(figsize=(10, 6))
+    fig = plt.figure(figsize=(10, 6))
 
     # Calculate cumulative points over time
-    for player in tournament.players:
-        plt.plot(game_data['Game ID'], game_data[f'WinRatio_{player}'], linestyle='-', label=player)
+    lines = plt.plot(game_ids, tournament.winRatio, linestyle='-')
 
-    plt.legend()
+    plt.legend(lines, tournament.players)
     plt.xlabel('Game Number')
     plt.ylabel('Win Ratio')
     plt.title(f'Win Ratio Over Time : {tournament.display()}')
     if save_image:
-        plt.savefig(get_graph_path(tournament.num(), 'win_ratio_timeseries'))
+        fig.savefig(get_graph_path(tournament.num(), 'win_ratio_timeseries', tournament.typ()))
     plt.grid(True)
-    plt.show()
+    show_or_close(fig, show)
+
+
+# save-only callers skip rendering, the figure is dropped so batch runs don't pile them up
+def show_or_close(fig, show: bool):
+    import matplotlib.pyplot as plt
+
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
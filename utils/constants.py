@@ -1,7 +1,8 @@
 from enum import Enum
+from functools import cache
 
 # non-player columns
-NON_PLAYER_COLUMNS = {'Bidder'}
+NON_PLAYER_COLUMNS = frozenset({'Bidder'})
 
 # class syntax
 class Players(Enum):
@@ -12,12 +13,30 @@ class Players(Enum):
     ANI = 5
     NAATI = 6
 
+# bar colours, so a player keeps the same colour across tournaments
+PLAYER_COLORS = {
+    Players.AKASH: 'pink',
+    Players.PRATEEK: 'lightblue',
+    Players.NATS: 'lightgreen',
+    Players.ABHI: 'lightcoral',
+    Players.ANI: 'khaki',
+    Players.NAATI: 'plum',
+}
+# guest players without an entry in Players
+GUEST_COLOR = 'lightgrey'
+
+def get_player_color(player_name):
+    player = Players.__members__.get(player_name.upper())
+    return PLAYER_COLORS.get(player, GUEST_COLOR)
+
 # class syntax
 class TournamentTypes(Enum):
     CHAMPIONSHIP = 'championship'
     MINI_CHAMPIONSHIP = 'mini_championship'
     FRIENDLY = 'international_friendly'
 
+    # display names and codes never change, so they're only built once per member
+    @cache
     def display(self):
         splits = self.value.split('_')
         camel_case_bits = []
@@ -26,6 +45,7 @@ class TournamentTypes(Enum):
         return ' '.join(camel_case_bits)
         
 
+    @cache
     def code(self):
         splits = self.value.split('_')
         # picking first character of each word
@@ -42,9 +62,8 @@ def get_datascore_path(tourney_number, tournament_type=TournamentTypes.CHAMPIONS
     return f'tourney_data/raw_scores/{tournament_type.value}_{tourney_number}.csv'
     
 
-# todo this function should take in tournament_type
-def get_graph_path(tourney_number, plot_type):
-    return f'tourney_data/graphs/C{tourney_number}_{plot_type}.png'
+def get_graph_path(tourney_number, plot_type, tournament_type=TournamentTypes.CHAMPIONSHIP):
+    return f'tourney_data/graphs/{tournament_type.code()}{tourney_number}_{plot_type}.png'
 
 
 
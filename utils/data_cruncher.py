@@ -1,24 +1,28 @@
 import pandas as pd
 import numpy as np
+from itertools import combinations
 
-from utils.data_preprocessor import get_game_data_as_timeseries, get_players, get_tourney_data_v2
+from utils.data_preprocessor import get_game_data_as_timeseries, get_players, get_score_matrix, get_tourney_data_v2
 
 # Get player stats from raw_df
-def get_player_stats(raw_df):
-
-  player_stats = raw_df.melt(id_vars=['Game ID'], var_name='Player', value_name='Points')
-  player_stats['Result'] = player_stats['Points'].apply(lambda x: 'Win' if x > 0 else 'Lose')
-  # Calculate wins, losses, and win ratio
-  player_stats['Wins'] = player_stats['Result'].apply(lambda x: 1 if x == 'Win' else 0)
-  player_stats['Losses'] = player_stats['Result'].apply(lambda x: 1 if x == 'Lose' else 0)
-
-  player_stats = player_stats.groupby('Player').agg(
-    Wins=pd.NamedAgg(column='Wins', aggfunc='sum'),
-    # Losses=pd.NamedAgg(column='Losses', aggfunc='sum'),
-    TotalGames=pd.NamedAgg(column='Game ID', aggfunc='count'),
-    AvgPoints=pd.NamedAgg(column='Points', aggfunc='mean'),
-    TotalPoints=pd.NamedAgg(column='Points', aggfunc='sum'),
-  ).reset_index()
+def get_player_stats(raw_df, scores=None, players=None):
+  if players is None:
+    players = get_players(raw_df)
+  if scores is None:
+    scores = get_score_matrix(raw_df, players)
+
+  # reducing each player's column directly, players listed by name as a groupby would
+  by_name = sorted(range(len(players)), key=lambda i: players[i])
+  points = scores[:, by_name]
+  total_games = points.shape[0]
+
+  player_stats = pd.DataFrame({
+    'Player': [players[i] for i in by_name],
+    'Wins': (points > 0).sum(axis=0),
+    'TotalGames': total_games,
+    'AvgPoints': points.mean(axis=0),
+    'TotalPoints': points.sum(axis=0),
+  })
 
   player_stats['WinPercentage'] = 100.0* player_stats['Wins'] / (player_stats['TotalGames'])
   player_stats = player_stats.sort_values(by=['TotalPoints', 'Wins'], ascending = False)
@@ -31,104 +35,65 @@ def get_player_stats(raw_df):
 def get_championship_details(tourney_number, tournament_type, save_csv = False):
     
     raw_df = get_tourney_data_v2(tourney_number, tournament_type)
-    game_data = get_game_data_as_timeseries(raw_df)
     players = get_players(raw_df)
+    # shared by every stat computed on this tournament
+    scores = get_score_matrix(raw_df, players)
+    game_data = get_game_data_as_timeseries(raw_df, scores, players)
 
-    player_stats = get_player_stats(raw_df)
+    player_stats = get_player_stats(raw_df, scores, players)
     if save_csv:
       player_stats.to_csv(f'tourney_data/graphs/{tournament_type.code()}{tourney_number}_player_stats.csv')
 
-    return raw_df, players, game_data, player_stats
-
-
-def get_bid_and_won_stats(raw_df):
-  players = get_players(raw_df)
-  
-  bid_and_win = {}
-  for player in players:
-    bid_and_win[player] = 0
-
-  for _, row in raw_df.iterrows():
-      x = row[1:]
-      if(x.sum()%x.max()!=0):
-        for player in players:
-          if x[player] == x.max():
-            bid_and_win[player] += 1
-
-  res = pd.DataFrame(bid_and_win.items(), columns=['Player', 'Bid and Won'])
-  res = res.sort_values(by=['Bid and Won'], ascending = False)
-  return res
-
-def get_pairwise_stats(df, min_num_games=10):
-
-  # Calculate statistics for each pair of players when they are on the same team
-  same_team_stats = df.melt(id_vars=['Game ID'], var_name='Player', value_name='Points')
-  same_team_stats['Result'] = same_team_stats['Points'].apply(lambda x: 'Win' if x > 0 else 'Lose')
-
-  same_team_stats['join_id'] = same_team_stats['Points'].apply(lambda x: 'Win' if x > 0 else 'Lose')
-
-  # computing pairwise by JOIN
-  result = same_team_stats.merge(same_team_stats, left_on=['Game ID', 'Result'], right_on=['Game ID', 'Result'], how='inner')
-  result = result[result['Player_x'] != result['Player_y']]
-  result = result[result['Player_x'] < result['Player_y']]
-  result['Wins'] = result['Result'].apply(lambda x: 1 if x == 'Win' else 0)
-  result['Losses'] = result['Result'].apply(lambda x: 1 if x == 'Lose' else 0)
-  result['Points'] = result[['Points_x','Points_y']].min(axis=1)
-
-  result = result.sort_values(by=['Game ID'])
-  result = result.reset_index()
-
-  result = result.groupby(['Player_x', 'Player_y']).agg(
-    Wins=pd.NamedAgg(column='Wins', aggfunc='sum'),
-    Losses=pd.NamedAgg(column='Losses', aggfunc='sum'),
-    TotalGames=pd.NamedAgg(column='Game ID', aggfunc='count'),
-    AvgPoints=pd.NamedAgg(column='Points', aggfunc='mean'),
-  ).reset_index()
-
-  result['WinPercentage'] = 100.0*result['Wins'] / (result['Wins'] + result['Losses'])
-  result = result.sort_values(by=['WinPercentage'], ascending = False)
-  # rounding up values
-  result = result.round({'AvgPoints': 1, 'WinPercentage': 1})
-
-  # filtering based on min_num_games threshold
-  result = result[result['TotalGames']>=min_num_games]
-
-  return result
-
-def get_tri_stats(df, min_num_games=5):
-
-  # Calculate statistics for each pair of players when they are on the same team
-  same_team_stats = df.melt(id_vars=['Game ID'], var_name='Player', value_name='Points')
-  same_team_stats['Result'] = same_team_stats['Points'].apply(lambda x: 'Win' if x > 0 else 'Lose')
-  same_team_stats['join_id'] = same_team_stats['Points'].apply(lambda x: 'Win' if x > 0 else 'Lose')
-
-  # computing pairwise by JOIN
-  result = same_team_stats.merge(same_team_stats, left_on=['Game ID', 'Result'], right_on=['Game ID', 'Result'], how='inner')
-  result = result.merge(same_team_stats, left_on=['Game ID', 'Result'], right_on=['Game ID', 'Result'], how='inner')
-  result = result.rename(columns={"Player": "Player_z", "Points": "Points_z"})
+    return raw_df, players, scores, game_data, player_stats
 
-  # filtering out bad values
-  result = result[result['Player_x'] != result['Player_y']]
-  result = result[result['Player_y'] != result['Player_z']]
-  result = result[result['Player_x'] != result['Player_z']]
 
-  result = result[result['Player_x'] < result['Player_y']]
-  result = result[result['Player_y'] < result['Player_z']]
-  result = result[result['Player_x'] < result['Player_z']]
+def get_bid_and_won_stats(raw_df, scores=None, players=None):
+  if players is None:
+    players = get_players(raw_df)
+  if scores is None:
+    scores = get_score_matrix(raw_df, players)
 
-  result['Wins'] = result['Result'].apply(lambda x: 1 if x == 'Win' else 0)
-  result['Losses'] = result['Result'].apply(lambda x: 1 if x == 'Lose' else 0)
-  result['Points'] = result[['Points_x','Points_y', 'Points_z']].min(axis=1)
+  # bidder scores more than the partners, so the game total isn't a multiple of the max
+  maxes = scores.max(axis=1)
+  bid_and_won = scores.sum(axis=1) % np.where(maxes == 0, 1, maxes) != 0
+  bid_and_win = ((scores == maxes[:, None]) & bid_and_won[:, None]).sum(axis=0)
 
-  result = result.sort_values(by=['Game ID'])
-  result = result.reset_index()
+  res = pd.DataFrame({'Player': players, 'Bid and Won': bid_and_win})
+  res = res.sort_values(by=['Bid and Won'], ascending = False)
+  return res
 
-  result = result.groupby(['Player_x', 'Player_y', 'Player_z']).agg(
-    Wins=pd.NamedAgg(column='Wins', aggfunc='sum'),
-    Losses=pd.NamedAgg(column='Losses', aggfunc='sum'),
-    TotalGames=pd.NamedAgg(column='Game ID', aggfunc='count'),
-    AvgPoints=pd.NamedAgg(column='Points', aggfunc='mean'),
-  ).reset_index()
+def get_pairwise_stats(df, min_num_games=10, scores=None, players=None):
+  return get_team_stats(df, 2, min_num_games, scores, players)
+
+def get_tri_stats(df, min_num_games=5, scores=None, players=None):
+  return get_team_stats(df, 3, min_num_games, scores, players)
+
+# Calculate statistics for each group of team_size players when they are on the same team
+def get_team_stats(df, team_size, min_num_games, scores=None, players=None):
+  if players is None:
+    players = get_players(df)
+  if scores is None:
+    scores = get_score_matrix(df, players)
+  won = scores > 0
+
+  # walking players in name order so groups come out sorted
+  by_name = sorted(range(len(players)), key=lambda i: players[i])
+  player_columns = ['Player_x', 'Player_y', 'Player_z'][:team_size]
+
+  teams = []
+  for team in combinations(by_name, team_size):
+    team = list(team)
+    # players are on the same team when all of them won or all of them lost
+    same_team = won[:, team].all(axis=1) | ~won[:, team].any(axis=1)
+    total_games = same_team.sum()
+    if total_games == 0:
+      continue
+
+    wins = (same_team & won[:, team[0]]).sum()
+    avg_points = scores[same_team][:, team].min(axis=1).mean()
+    teams.append((*[players[i] for i in team], wins, total_games - wins, total_games, avg_points))
+
+  result = pd.DataFrame(teams, columns=[*player_columns, 'Wins', 'Losses', 'TotalGames', 'AvgPoints'])
 
   result['WinPercentage'] = 100.0*result['Wins'] / (result['Wins'] + result['Losses'])
   result = result.sort_values(by=['WinPercentage'], ascending = False)
@@ -1,22 +1,37 @@
+import os
 import pandas as pd
 import numpy as np
+from collections import defaultdict
 
 from utils.constants import NON_PLAYER_COLUMNS, TournamentTypes, get_datascore_path
 
+# parsed tournament csvs keyed on (tournament_type, tourney_number), along with the file's
+# modification time and size when parsed so csvs edited mid-session are read again
+_RAW_CACHE = {}
+
 # returns raw_df containing tournament scores
 def get_tourney_data_v2(tourney_number, tournament_type):
-  
-  df = pd.read_csv(get_datascore_path(tourney_number, tournament_type))
+  key = (tournament_type, tourney_number)
+  stat = os.stat(get_datascore_path(tourney_number, tournament_type))
+  version = (stat.st_mtime_ns, stat.st_size)
+
+  if key not in _RAW_CACHE or _RAW_CACHE[key][0] != version:
+    _RAW_CACHE[key] = (version, read_tourney_csv(tourney_number, tournament_type))
+
+  # handing out a copy so callers can't mutate the cached frame
+  return _RAW_CACHE[key][1].copy()
+
+# parses the tournament csv from disk
+def read_tourney_csv(tourney_number, tournament_type):
+
+  # typing columns while parsing, non-player columns (bidder names repeat every game) are categories
+  # (scores stay int64, pandas raises on a value that doesn't fit instead of wrapping it around)
+  dtypes = defaultdict(lambda: np.int64, {col: 'category' for col in NON_PLAYER_COLUMNS})
+  df = pd.read_csv(get_datascore_path(tourney_number, tournament_type), dtype=dtypes)
 
   # inserting new column for Game ID
   df.insert(0, 'Game ID', np.arange(1, df.shape[0]+1))
 
-  for col in df.columns:
-    # optional block if you have bidder info
-    if col in NON_PLAYER_COLUMNS:
-        continue
-    df[col] = df[col].astype(int)
-
   return df
 
 # returns List of players participating using raw_df
@@ -24,17 +39,35 @@ def get_players(raw_df):
   players = list(filter(lambda player: player not in NON_PLAYER_COLUMNS, list(raw_df.columns[1:])))
   return players
 
+# returns (games x players) matrix of scores, columns ordered as get_players
+def get_score_matrix(raw_df, players=None):
+  if players is None:
+    players = get_players(raw_df)
+  return raw_df[players].to_numpy()
+
 # returns game_data which is enhanced raw_df
-def get_game_data_as_timeseries(raw_df):
-  # Load the data from the CSV file
-  game_data = raw_df.copy(deep=True)
-  players = get_players(raw_df)
-
-  for player in players:
-    game_data[f'CumSum_{player}'] = game_data[player].cumsum()
-    game_data[f'MovingAvgPoints_{player}'] = game_data[f'CumSum_{player}']/game_data['Game ID']
-    game_data[f'{player}_Won'] = game_data[f'{player}'].apply(lambda x: 1 if x > 0 else 0)
-    game_data[f'NumGamesWon_{player}'] = game_data[f'{player}_Won'].cumsum()
-    game_data[f'WinRatio_{player}'] = game_data[f'NumGamesWon_{player}']/game_data['Game ID']
+def get_game_data_as_timeseries(raw_df, scores=None, players=None):
+  if players is None:
+    players = get_players(raw_df)
+  if scores is None:
+    scores = get_score_matrix(raw_df, players)
+  game_ids = raw_df['Game ID'].to_numpy()[:, None]
+
+  # computing every player's series at once on the score matrix
+  cum_sum = scores.cumsum(axis=0)
+  moving_avg_points = cum_sum/game_ids
+  won = (scores > 0).astype(int)
+  num_games_won = won.cumsum(axis=0)
+  win_ratio = num_games_won/game_ids
+
+  columns = {}
+  for i, player in enumerate(players):
+    columns[f'CumSum_{player}'] = cum_sum[:, i]
+    columns[f'MovingAvgPoints_{player}'] = moving_avg_points[:, i]
+    columns[f'{player}_Won'] = won[:, i]
+    columns[f'NumGamesWon_{player}'] = num_games_won[:, i]
+    columns[f'WinRatio_{player}'] = win_ratio[:, i]
+
+  game_data = pd.concat([raw_df, pd.DataFrame(columns, index=raw_df.index)], axis=1)
 
   return game_data
@@ -1,7 +1,9 @@
+import os
 import pandas as pd
-from utils.Player import PlayerProfile
+import numpy as np
+from operator import attrgetter
+from utils.Player import PlayerProfile, PlayerRoster, PlayerSnapshot
 from utils.Tournament import Tournament
-import copy
 
 BASE_RATING = 1000
 DENOMINATOR = 200
@@ -34,29 +36,26 @@ Certainly! Developing a scoring system for a card game involves considering vari
 By considering these factors and implementing them into your scoring system algorithm, you can create a robust and fair system for evaluating player performance in the card game. Adjustments may be necessary over time as you gather more data and insights into player behavior and preferences.
 
 '''
+def sortByRating(player_map):
+    # reverse keeps ties in registration order, same as sorting on negated ratings
+    return sorted(player_map.values(), key=attrgetter('rating'), reverse=True)
+
 def rankPlayerMap(player_map):
-    rankings = {k: v for k, v in sorted(player_map.items(), key=lambda item: -1*item[1].rating)}
+    rankings = {player.name: player for player in sortByRating(player_map)}
     return rankings
 
-def getPlayersToRankMapping(rankings):
-    rank = 1
-    player_to_rank = {}
-    for key, _ in rankings.items():
-        player_to_rank[key] = rank
-        rank = rank + 1
-    return player_to_rank
-
 
 class UniversalRatingSystem:
 
     def __init__(self):
+        self.roster = PlayerRoster()
         self.playerMap = {}
         self.tournaments = []
         self.preTournamentRatings = {}
         self.postTournamentRatings = {}
 
     def getRankingsSnapshot(self):
-        return copy.deepcopy(self.getRankings())
+        return rankPlayerMap(self.roster.snapshot())
     
     def showRankingChange(self, tournament: Tournament):
         tourney_key = tournament.display()
@@ -84,31 +83,23 @@ class UniversalRatingSystem:
         return (player_name in self.playerMap)
     
     def registerPlayer(self, player_name):
-        self.playerMap[player_name] = PlayerProfile(player_name, rating=BASE_RATING)
+        idx = self.roster.register(player_name, rating=BASE_RATING)
+        self.playerMap[player_name] = PlayerProfile(self.roster, idx)
 
     def getPlayerProfile(self, player_name):
-        assert self.isRegistered(player_name)
+        player_profile = self.playerMap.get(player_name)
+        assert player_profile is not None, f'{player_name} is not registered'
 
-        return self.playerMap[player_name]
+        return player_profile
     
     # Records the game
     def record_game(self, row, players):
-        # Define teams and base points
-        winning_team = []
-        losing_team = []
-        winning_team_points = []
-
-        for player in players:
-            if row[player] > 0:
-                winning_team.append(self.getPlayerProfile(player))
-                winning_team_points.append(row[player])
-            else:
-                losing_team.append(self.getPlayerProfile(player))
-
-        calculate_rating_change(winning_team, losing_team, winning_team_points)
+        # Define teams and base points, looked up per label so plain dicts and rows with a Bidder column both work
+        points = np.array([row[player] for player in players], dtype=np.int64)
+        team = np.array([self.getPlayerProfile(player).idx for player in players])
+        record_games(self.roster, points[None, :], team)
 
     def addTournamentData(self, tournament: Tournament):
-        game_records = tournament.rawData
         players = tournament.players
         tourney_key = tournament.display()
 
@@ -119,42 +110,95 @@ class UniversalRatingSystem:
             if not self.isRegistered(player):
                 self.registerPlayer(player)
         
-        before_player_ratings = self.getRankingsSnapshot()
+        # snapshots are only ranked when printed
+        before_player_ratings = self.roster.snapshot()
         self.preTournamentRatings[tourney_key] = before_player_ratings
 
         # feeding in scores one game at a time
-        for _, row in game_records.iterrows():
-            self.record_game(row, players)
+        scores = tournament.scores
+        team = np.array([self.getPlayerProfile(player).idx for player in players])
+        record_games(self.roster, scores, team)
 
-        after_player_ratings = self.getRankingsSnapshot()
+        after_player_ratings = self.roster.snapshot()
         self.postTournamentRatings[tourney_key] = after_player_ratings
         
         return before_player_ratings, after_player_ratings
 
     # load from stored files
-    # def load(self):
-    
-    # def save(self):
+    def load(self, path):
+        with np.load(getSavePath(path)) as data:
+            self.roster = PlayerRoster()
+            self.playerMap = {}
+            for player in data['names'].tolist():
+                self.registerPlayer(player)
 
-def printRankingChange(old_rankings, new_rankings):
+            self.roster.ratings = data['ratings']
+            self.roster.careerGames = data['careerGames']
+            self.roster.careerWins = data['careerWins']
+            self.roster.bidAndWon = data['bidAndWon']
+            self.tournaments = data['tournaments'].tolist()
+
+            names = self.roster.names
+            before = unpackSnapshots(names, data['preSizes'], data['preRatings'], data['preCounters'])
+            after = unpackSnapshots(names, data['postSizes'], data['postRatings'], data['postCounters'])
+
+        self.preTournamentRatings = dict(zip(self.tournaments, before))
+        self.postTournamentRatings = dict(zip(self.tournaments, after))
+
+    def save(self, path):
+        before = packSnapshots([self.preTournamentRatings[key] for key in self.tournaments])
+        after = packSnapshots([self.postTournamentRatings[key] for key in self.tournaments])
+
+        np.savez_compressed(
+            getSavePath(path),
+            names=np.array(self.roster.names, dtype=str),
+            ratings=self.roster.ratings,
+            careerGames=self.roster.careerGames,
+            careerWins=self.roster.careerWins,
+            bidAndWon=self.roster.bidAndWon,
+            tournaments=np.array(self.tournaments, dtype=str),
+            preSizes=before[0], preRatings=before[1], preCounters=before[2],
+            postSizes=after[0], postRatings=after[1], postCounters=after[2],
+        )
+
+# np.savez_compressed appends .npz when it's missing but np.load doesn't, so both go through here
+def getSavePath(path):
+    path = os.fspath(path)
+    return path if path.endswith('.npz') else f'{path}.npz'
+
+# players are only ever appended to the roster, so every snapshot covers the first len(snapshot)
+# roster names in order and can be stored as flat rating / counter arrays plus its size
+def packSnapshots(snapshots):
+    players = [player for snapshot in snapshots for player in snapshot.values()]
+    sizes = np.array([len(snapshot) for snapshot in snapshots], dtype=np.int64)
+    ratings = np.array([player.rating for player in players], dtype=np.float64)
+    counters = np.array([(player.careerGames, player.careerWins, player.bidAndWon) for player in players], dtype=np.int64).reshape(-1, 3)
+    return sizes, ratings, counters
+
+def unpackSnapshots(names, sizes, ratings, counters):
+    snapshots = []
+    start = 0
+    for size in sizes.tolist():
+        end = start + size
+        columns = zip(names[:size], ratings[start:end].tolist(), counters[start:end].tolist())
+        snapshots.append({name: PlayerSnapshot(name, rating, *counts) for name, rating, counts in columns})
+        start = end
+    return snapshots
+
+def printRankingChange(before, after):
     
     # sorting based on ratings
-    # old_rankings =  rankPlayerMap(before)
-    # new_rankings =  rankPlayerMap(after)
-    
-    old_ranks = getPlayersToRankMapping(old_rankings)
-    new_ranks = getPlayersToRankMapping(new_rankings)
+    old_ranks = {player.name: rank for rank, player in enumerate(sortByRating(before), 1)}
+    new_rankings = sortByRating(after)
 
-    rank = 1
-    
-    player_rows = {}
+    player_rows = []
 
-    for player in new_rankings.values():
+    for rank, player in enumerate(new_rankings, 1):
         new_rating = int(player.rating)
-        old_rating = old_rankings[player.name].rating
+        old_rating = before[player.name].rating
 
         rating_change = int(new_rating - old_rating)
-        rank_change = old_ranks[player.name] - new_ranks[player.name]
+        rank_change = old_ranks[player.name] - rank
 
         if rank_change > 0:
             rank_change = u"\u25B2"+f" {rank_change}"
@@ -167,25 +211,36 @@ def printRankingChange(old_rankings, new_rankings):
         if rating_change > 0:
             rating_change = f'+{rating_change}'
         
-        player_rows[rank] = player.getDictForLeaderboard(rank, rank_change, new_rating, rating_change)
-        rank = rank + 1
+        player_rows.append(player.getDictForLeaderboard(rank, rank_change, new_rating, rating_change))
 
     # Create DataFrame
-    df = pd.DataFrame(player_rows).transpose()
+    df = pd.DataFrame.from_records(player_rows)
     df = df.style.hide()
     display(df)
     
     
     print('\n -----------------------------')
 
-def calculate_rating_change(winning_team, losing_team, winning_team_points):
-    assert len(winning_team) == len(winning_team_points)
+# replays games in order, team maps the score columns to roster indices
+def record_games(roster: PlayerRoster, scores, team):
+    won = scores > 0
+    for game_scores, game_won in zip(scores, won):
+        calculate_rating_change(roster, team[game_won], team[~game_won], game_scores[game_won])
 
-    bid = min(winning_team_points)
+# winning_team and losing_team hold roster indices of the players,
+# winning_team_points lines up with winning_team as both come from the same mask in record_games
+def calculate_rating_change(roster: PlayerRoster, winning_team, losing_team, winning_team_points):
+    # an empty team would turn its mean rating into NaN and corrupt every rating it touches
+    if winning_team.size == 0:
+        raise ValueError('Game has no winning team, at least one player must score above 0')
+    if losing_team.size == 0:
+        raise ValueError('Game has no losing team, at least one player must score 0 or below')
+
+    bid = winning_team_points.min()
 
     # Calculate average ratings of winning and losing teams
-    avg_winning_rating = sum(player.rating for player in winning_team) / len(winning_team)
-    avg_losing_rating = sum(player.rating for player in losing_team) / len(losing_team)  
+    avg_winning_rating = roster.ratings[winning_team].mean()
+    avg_losing_rating = roster.ratings[losing_team].mean()
 
     # Calculate adjustment factor based on rating difference
     rating_difference = avg_winning_rating - avg_losing_rating
@@ -193,7 +248,11 @@ def calculate_rating_change(winning_team, losing_team, winning_team_points):
     # if winning team is weaker --> rating_difference < 0
 
     # capping adjustment factor to [-0.5, 0.5] range
-    adjustment_factor = max(-0.5, min(0.5, rating_difference/BASE_RATING))
+    adjustment_factor = rating_difference/BASE_RATING
+    if adjustment_factor > 0.5:
+        adjustment_factor = 0.5
+    elif adjustment_factor < -0.5:
+        adjustment_factor = -0.5
 
     # Calculate adjusted points for the winning team
     # case 1 - both are equal --> adjustment_factor = 0
@@ -201,14 +260,10 @@ def calculate_rating_change(winning_team, losing_team, winning_team_points):
     # case 3 - winning team is weaker --> adjustment_factor < 0 [increase reward by x%]
     
     # Update ratings for players in winning team
-    for player, player_points in zip(winning_team, winning_team_points):
-        adjusted_points = (player_points/DENOMINATOR) * (1-adjustment_factor)
-        # registering game in player object
-        player.register_win(adjusted_points, bid_and_won = (player_points>bid))
-        
+    adjusted_points = (winning_team_points/DENOMINATOR) * (1-adjustment_factor)
+    roster.register_wins(winning_team, adjusted_points, bid_and_won = (winning_team_points>bid))
+
     # Update ratings for players in losing team
-    for player in losing_team:
-        adjusted_points = (bid/DENOMINATOR) * (1-adjustment_factor)
-        # registering game in player object
-        player.register_loss(adjusted_points)
+    adjusted_points = (bid/DENOMINATOR) * (1-adjustment_factor)
+    roster.register_losses(losing_team, adjusted_points)
 
@@ -1,20 +1,40 @@
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
-from utils.Tournament import Tournament
-from utils.constants import TOURNAMENT_LIST_CHRONOLOGICAL
+from utils.Tournament import Tournament, get_tournament_key
+from utils.constants import TOURNAMENT_LIST_CHRONOLOGICAL, TournamentTypes
 from utils.ranking_system import UniversalRatingSystem
 
 
+def load_tournament(tournament_type: TournamentTypes, tournament_number: int):
+    return Tournament(tournament_type, tournament_number, display = False)
+
+
+# Builds tournaments in the given order, spread across worker processes if workers > 1
+def load_tournaments(tournament_list, workers: int = 1):
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(load_tournament, *zip(*tournament_list)))
+
+    return [load_tournament(tournament_type, tournament_number) for tournament_type, tournament_number in tournament_list]
+
+
 # Loads all tournaments from history
-def load_tournaments_from_history(universal_rating_system: UniversalRatingSystem):
+def load_tournaments_from_history(universal_rating_system: UniversalRatingSystem, workers: int = 1, verbose: bool = True):
 
-    # Historical tournaments
-    past_tournaments = TOURNAMENT_LIST_CHRONOLOGICAL
+    # Historical tournaments, skipping ones the rating system already has (e.g. loaded from a save)
+    processed = set(universal_rating_system.tournaments)
+    past_tournaments = [(tournament_type, tournament_number) for tournament_type, tournament_number in TOURNAMENT_LIST_CHRONOLOGICAL
+                        if get_tournament_key(tournament_type, tournament_number) not in processed]
 
-    print('Going back in time!')
+    if verbose:
+        print('Going back in time!')
     size = len(past_tournaments)
-    for TOURNAMENT_TYPE, TOURNEY_NUMBER in tqdm(past_tournaments, position=0, leave=True, total=size):
-        
-        tournament = Tournament(TOURNAMENT_TYPE, TOURNEY_NUMBER, display = False)
-        # reading 
-        _, _ = universal_rating_system.addTournamentData(tournament)
+    if workers > 1:
+        # tournament stats are independent, only the rating replay has to be chronological
+        tournaments = load_tournaments(past_tournaments, workers)
+    else:
+        tournaments = (load_tournament(TOURNAMENT_TYPE, TOURNEY_NUMBER) for TOURNAMENT_TYPE, TOURNEY_NUMBER in past_tournaments)
 
+    for tournament in tqdm(tournaments, position=0, leave=True, total=size, mininterval=0.5, disable=not verbose):
+        # reading
+        _, _ = universal_rating_system.addTournamentData(tournament)